@@ -2,23 +2,68 @@
 FastAPI backend for GitHub Issue Assistant.
 Provides API endpoint for analyzing GitHub issues using AI.
 """
-import time
-from typing import Dict, Optional
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Annotated, Dict, Optional
+from fastapi import Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, StringConstraints
+from redis.exceptions import RedisError
 import uvicorn
 
-from config import Config
+from batcher import AnalysisBatcher
+from cache import LRUTTLCache, RedisCache
+from config import config
 from github_client import GitHubClient
-from llm_analyzer import LLMAnalyzer
+from llm_analyzer import LLMAnalyzer, LLMBlockedError, LLMUnavailableError
+
+
+logger = logging.getLogger(__name__)
+
+# Initialize clients
+github_client = GitHubClient()
+llm_analyzer = LLMAnalyzer()
+batcher = AnalysisBatcher(llm_analyzer)
+
+# Bounded in-memory cache, replaced by a shared Redis cache when configured
+# (and used as a fallback while Redis is unreachable)
+cache = LRUTTLCache(max_size=config.cache_max_size, ttl=config.cache_ttl)
+redis_cache: Optional[RedisCache] = RedisCache(config.redis_url) if config.redis_url else None
+
+# Analyses currently running, so duplicate requests can await the same result
+in_flight: Dict[str, asyncio.Future] = {}
+
+
+async def sweep_cache_periodically():
+    """Drop expired cache entries so idle keys don't linger in memory."""
+    while True:
+        await asyncio.sleep(config.cache_sweep_interval)
+        cache.sweep()
+        github_client.etag_cache.sweep()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background tasks and release pooled HTTP connections on shutdown."""
+    await batcher.start()
+    sweeper = asyncio.create_task(sweep_cache_periodically())
+    yield
+    sweeper.cancel()
+    await batcher.stop()
+    await github_client.aclose()
+    if redis_cache is not None:
+        await redis_cache.aclose()
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="GitHub Issue Assistant API",
     description="AI-powered GitHub issue analysis and prioritization",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware for frontend integration
@@ -30,25 +75,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize clients
-github_client = GitHubClient()
-llm_analyzer = LLMAnalyzer()
 
-# Simple in-memory cache
-cache: Dict[str, tuple] = {}  # {cache_key: (data, timestamp)}
+# Validated by pydantic-core (no Python validator on the request path)
+GitHubRepoUrl = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, pattern=r"github\.com/[^/]+/[^/]+")
+]
 
 
 class AnalyzeRequest(BaseModel):
     """Request model for issue analysis."""
-    repo_url: str = Field(..., description="GitHub repository URL")
+    repo_url: GitHubRepoUrl = Field(..., description="GitHub repository URL")
     issue_number: int = Field(..., gt=0, description="Issue number (must be positive)")
-    
-    @validator('repo_url')
-    def validate_repo_url(cls, v):
-        """Validate repository URL format."""
-        if "github.com" not in v:
-            raise ValueError("Must be a valid GitHub repository URL")
-        return v.strip()
 
 
 class AnalysisResponse(BaseModel):
@@ -61,32 +99,124 @@ class AnalysisResponse(BaseModel):
     metadata: Dict = Field(default_factory=dict)
 
 
+class BatchItemResult(BaseModel):
+    """Result for one issue in a batch analysis."""
+    repo_url: str
+    issue_number: int
+    status_code: int = 200
+    analysis: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+
 def get_cache_key(repo_url: str, issue_number: int) -> str:
     """Generate cache key for an issue."""
     return f"{repo_url}::{issue_number}"
 
 
-def get_from_cache(cache_key: str) -> Optional[Dict]:
+async def get_from_cache(cache_key: str) -> Optional[Dict]:
     """Get data from cache if still valid."""
-    if not Config.CACHE_ENABLED:
+    if not config.cache_enabled:
         return None
     
-    if cache_key in cache:
-        data, timestamp = cache[cache_key]
-        # Check if cache is still valid
-        if time.time() - timestamp < Config.CACHE_TTL:
-            return data
-        else:
-            # Remove expired cache
-            del cache[cache_key]
+    if redis_cache is not None:
+        try:
+            return await redis_cache.get(cache_key)
+        except RedisError as e:
+            logger.warning("Redis unavailable, reading the in-process cache: %s", e)
     
-    return None
+    return cache.get(cache_key)
 
 
-def set_cache(cache_key: str, data: Dict):
+async def set_cache(cache_key: str, data: Dict):
     """Store data in cache."""
-    if Config.CACHE_ENABLED:
-        cache[cache_key] = (data, time.time())
+    if not config.cache_enabled:
+        return
+    
+    if redis_cache is not None:
+        try:
+            await redis_cache.set(cache_key, data)
+            return
+        except RedisError as e:
+            logger.warning("Redis unavailable, writing the in-process cache: %s", e)
+    
+    cache.set(cache_key, data)
+
+
+async def run_analysis(request: AnalyzeRequest) -> Dict:
+    """
+    Fetch an issue from GitHub and analyze it with the LLM.
+    
+    Args:
+        request: AnalyzeRequest containing repo_url and issue_number
+    
+    Returns:
+        Analysis dictionary including response metadata
+    """
+    # Fetch issue data from GitHub
+    issue_data = await github_client.get_issue_data(
+        repo_url=request.repo_url,
+        issue_number=request.issue_number
+    )
+    
+    # Analyze with LLM
+    analysis = await batcher.analyze_issue(issue_data)
+    
+    # Add metadata
+    return {
+        **analysis,
+        "metadata": {
+            "issue_url": issue_data.html_url,
+            "issue_state": issue_data.state,
+            "comments_count": issue_data.comments_count,
+            "created_at": issue_data.created_at,
+            "cached": False
+        }
+    }
+
+
+async def analyze_uncached(cache_key: str, request: AnalyzeRequest) -> Dict:
+    """
+    Run the analysis pipeline for a cache miss and cache the result.
+    
+    With Redis configured, a SET NX lock makes sure only one worker runs
+    the pipeline for a given key; the others wait for its cached result.
+    If Redis is unreachable, the analysis runs without the lock.
+    
+    Args:
+        cache_key: Cache key for the issue
+        request: AnalyzeRequest containing repo_url and issue_number
+    
+    Returns:
+        Analysis dictionary including response metadata
+    """
+    lock_token = None
+    if redis_cache is not None and config.cache_enabled:
+        try:
+            lock_token = await redis_cache.acquire_lock(cache_key, config.cache_lock_ttl)
+            if lock_token is None:
+                # Another worker is analyzing this issue, reuse its result
+                cached_data = await redis_cache.wait_for(cache_key, timeout=config.cache_lock_ttl)
+                if cached_data is not None:
+                    return cached_data
+                lock_token = await redis_cache.acquire_lock(cache_key, config.cache_lock_ttl)
+        except RedisError as e:
+            logger.warning("Redis unavailable, analyzing without the shared lock: %s", e)
+            lock_token = None
+    
+    try:
+        response_data = await run_analysis(request)
+        
+        # Cache the result
+        await set_cache(cache_key, response_data)
+        
+        return response_data
+    finally:
+        if lock_token is not None:
+            try:
+                await redis_cache.release_lock(cache_key, lock_token)
+            except RedisError as e:
+                # The lock expires on its own after CACHE_LOCK_TTL
+                logger.warning("Redis unavailable, could not release lock: %s", e)
 
 
 @app.get("/")
@@ -98,6 +228,8 @@ async def root():
         "status": "running",
         "endpoints": {
             "analyze": "/api/analyze",
+            "analyze_batch": "/api/analyze_batch",
+            "cache_stats": "/api/cache/stats",
             "docs": "/docs"
         }
     }
@@ -109,6 +241,54 @@ async def health_check():
     return {"status": "healthy"}
 
 
+def to_http_exception(error: Exception) -> HTTPException:
+    """Map an analysis error to the HTTP error returned to the client."""
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, LLMBlockedError):
+        # Issue content was rejected by the LLM's safety filters
+        return HTTPException(status_code=422, detail=str(error))
+    if isinstance(error, LLMUnavailableError):
+        # LLM failed or stayed unavailable after retries
+        return HTTPException(status_code=503, detail=str(error))
+    if isinstance(error, ValueError):
+        # Client errors (invalid input, not found, etc.)
+        return HTTPException(status_code=400, detail=str(error))
+    # Server errors
+    return HTTPException(
+        status_code=500,
+        detail=f"Internal server error: {str(error)}"
+    )
+
+
+async def analyze_one(request: AnalyzeRequest) -> Dict:
+    """
+    Analyze one issue, using the cache and joining identical in-flight analyses.
+    
+    Args:
+        request: AnalyzeRequest containing repo_url and issue_number
+    
+    Returns:
+        Analysis dictionary including response metadata
+    """
+    # Check cache first
+    cache_key = get_cache_key(request.repo_url, request.issue_number)
+    cached_data = await get_from_cache(cache_key)
+    
+    if cached_data:
+        return cached_data
+    
+    # Join an identical analysis that is already running, if any
+    future = in_flight.get(cache_key)
+    if future is None:
+        future = asyncio.ensure_future(analyze_uncached(cache_key, request))
+        in_flight[cache_key] = future
+        future.add_done_callback(lambda _: in_flight.pop(cache_key, None))
+    
+    # Shield so one client disconnecting doesn't cancel the shared analysis
+    return await asyncio.shield(future)
+
+
 @app.post("/api/analyze", response_model=AnalysisResponse)
 async def analyze_issue(request: AnalyzeRequest):
     """
@@ -128,66 +308,87 @@ async def analyze_issue(request: AnalyzeRequest):
         HTTPException: If analysis fails
     """
     try:
-        # Check cache first
-        cache_key = get_cache_key(request.repo_url, request.issue_number)
-        cached_data = get_from_cache(cache_key)
-        
-        if cached_data:
-            return AnalysisResponse(**cached_data)
-        
-        # Fetch issue data from GitHub
-        issue_data = github_client.get_issue_data(
-            repo_url=request.repo_url,
-            issue_number=request.issue_number
-        )
-        
-        # Analyze with LLM
-        analysis = llm_analyzer.analyze_issue(issue_data)
-        
-        # Add metadata
-        response_data = {
-            **analysis,
-            "metadata": {
-                "issue_url": issue_data.get("html_url", ""),
-                "issue_state": issue_data.get("state", ""),
-                "comments_count": issue_data.get("comments_count", 0),
-                "created_at": issue_data.get("created_at", ""),
-                "cached": False
-            }
-        }
-        
-        # Cache the result
-        set_cache(cache_key, response_data)
-        
+        response_data = await analyze_one(request)
         return AnalysisResponse(**response_data)
-        
-    except ValueError as e:
-        # Client errors (invalid input, not found, etc.)
-        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # Server errors
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
+        raise to_http_exception(e)
+
+
+@app.post("/api/analyze_batch", response_model=list[BatchItemResult])
+async def analyze_batch(
+    requests: Annotated[list[AnalyzeRequest], Body(min_length=1, max_length=config.max_batch_requests)]
+):
+    """
+    Analyze several GitHub issues in one request.
+    
+    Issues are fetched from GitHub concurrently, and their LLM analyses go
+    through the shared batcher, so they coalesce into as few Gemini calls
+    as possible (together with any concurrent /api/analyze requests).
+    
+    Args:
+        requests: List of AnalyzeRequest objects
+    
+    Returns:
+        One BatchItemResult per request, in the same order; failed items
+        carry status_code and error instead of an analysis
+    """
+    results = await asyncio.gather(
+        *(analyze_one(request) for request in requests),
+        return_exceptions=True
+    )
+    
+    items = []
+    for request, result in zip(requests, results):
+        if isinstance(result, Exception):
+            error = to_http_exception(result)
+            items.append(BatchItemResult(
+                repo_url=request.repo_url,
+                issue_number=request.issue_number,
+                status_code=error.status_code,
+                error=error.detail
+            ))
+        else:
+            items.append(BatchItemResult(
+                repo_url=request.repo_url,
+                issue_number=request.issue_number,
+                analysis=AnalysisResponse(**result)
+            ))
+    
+    return items
 
 
 @app.delete("/api/cache")
 async def clear_cache():
     """Clear the analysis cache."""
     cache.clear()
+    if redis_cache is not None:
+        try:
+            await redis_cache.clear()
+        except RedisError as e:
+            logger.warning("Redis unavailable, cleared only the in-process cache: %s", e)
+            return {"message": "In-process cache cleared; shared Redis cache unavailable"}
     return {"message": "Cache cleared successfully"}
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Get analysis cache size and hit/miss/eviction counters."""
+    if redis_cache is not None:
+        try:
+            return await redis_cache.stats()
+        except RedisError as e:
+            logger.warning("Redis unavailable, reporting the in-process cache: %s", e)
+    return cache.stats()
+
+
 if __name__ == "__main__":
     print("Starting GitHub Issue Assistant API...")
-    print(f"Server running at http://{Config.HOST}:{Config.PORT}")
-    print(f"API documentation at http://{Config.HOST}:{Config.PORT}/docs")
-    
-    uvicorn.run(
-        "app:app",
-        host=Config.HOST,
-        port=Config.PORT,
-        reload=True,  # Enable auto-reload during development
-        log_level="info"
-    )
+    print(f"Server running at http://{config.host}:{config.port}")
+    print(f"API documentation at http://{config.host}:{config.port}/docs")
+    
+    if config.reload:
+        # Auto-reload during development (single process)
+        uvicorn.run("app:app", host=config.host, port=config.port, reload=True, log_level="info")
+    else:
+        # One process per worker; set REDIS_URL so workers share the cache
+        uvicorn.run("app:app", host=config.host, port=config.port, workers=config.workers, log_level="info")
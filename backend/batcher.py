@@ -0,0 +1,112 @@
+"""
+Dynamic batcher for LLM issue analysis.
+Coalesces concurrent analysis requests into a single Gemini call.
+"""
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+from config import config
+from github_client import IssueData
+from llm_analyzer import LLMAnalyzer
+
+
+class AnalysisBatcher:
+    """Collects concurrent analyses and dispatches them as one batched LLM call."""
+    
+    def __init__(
+        self,
+        analyzer: LLMAnalyzer,
+        max_batch_size: int = config.batch_max_size,
+        max_delay: float = config.batch_max_delay
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            analyzer: LLMAnalyzer used to run the batched calls
+            max_batch_size: Maximum number of issues sent in one LLM call
+            max_delay: Maximum seconds to wait for a batch to fill up
+        """
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    async def start(self):
+        """Start the background task that collects batches."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop collecting batches and wait for in-flight ones to finish."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+    
+    async def analyze_issue(self, issue_data: IssueData) -> Dict:
+        """
+        Queue an issue for analysis and wait for its result.
+        
+        Args:
+            issue_data: IssueData describing the issue
+        
+        Returns:
+            Structured analysis as dictionary
+        """
+        if self._worker is None:
+            # Batcher not running (e.g. outside the app lifespan)
+            return await self.analyzer.analyze_issue(issue_data)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((issue_data, future))
+        return await future
+    
+    async def _run(self):
+        """Pull queued issues into batches of up to max_batch_size or max_delay."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without blocking collection of the next batch
+            task = asyncio.create_task(self._process_batch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _process_batch(self, batch: List[Tuple[IssueData, asyncio.Future]]):
+        """Run one batched LLM call and hand each result back to its caller."""
+        try:
+            results = await self.analyzer.analyze_batch([issue_data for issue_data, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            # Caller may have gone away (e.g. client disconnected)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
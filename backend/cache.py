@@ -0,0 +1,208 @@
+"""
+Caches for analysis results.
+In-process LRU with TTL expiry, or Redis shared across worker processes.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import orjson
+import redis.asyncio as redis
+from config import config
+
+
+class LRUTTLCache:
+    """Least-recently-used cache whose entries also expire after a TTL."""
+    
+    def __init__(self, max_size: int = config.cache_max_size, ttl: int = config.cache_ttl):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries kept before evicting the oldest
+            ttl: Seconds an entry stays valid after it is set
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()  # {key: (data, expires_at)}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if present and not expired, marking it recently used."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        data, expires_at = entry
+        if expires_at <= time.time():
+            # Remove expired entry
+            del self._data[key]
+            self.misses += 1
+            return None
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return data
+    
+    def set(self, key: str, data: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        self._data[key] = (data, time.time() + self.ttl)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def sweep(self) -> int:
+        """
+        Drop all expired entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+    
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+    
+    def stats(self) -> Dict:
+        """Return size and hit/miss/eviction counters."""
+        return {
+            "backend": "memory",
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """Cache shared by all worker processes, backed by Redis (or DragonflyDB)."""
+    
+    KEY_PREFIX = "gia:analysis:"
+    LOCK_PREFIX = "gia:lock:"
+    SCAN_COUNT = 1000  # Keys fetched per SCAN round trip
+    
+    # Delete the lock only if it is still held by the caller's token
+    _RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+    
+    def __init__(self, url: str, ttl: int = config.cache_ttl):
+        """
+        Initialize the Redis cache.
+        
+        Args:
+            url: Redis connection URL (e.g., redis://localhost:6379/0)
+            ttl: Seconds an entry stays valid after it is set
+        """
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value if present; Redis handles expiry."""
+        raw = await self._redis.get(self.KEY_PREFIX + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return orjson.loads(raw)
+    
+    async def set(self, key: str, data: Any):
+        """Store a value with the configured TTL."""
+        await self._redis.set(self.KEY_PREFIX + key, orjson.dumps(data), ex=self.ttl)
+    
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """
+        Try to take the single-flight lock for a key (SET NX with expiry).
+        
+        Args:
+            key: Cache key being computed
+            ttl: Seconds before the lock expires if never released
+        
+        Returns:
+            Lock token if acquired, None if another worker holds the lock
+        """
+        token = uuid.uuid4().hex
+        acquired = await self._redis.set(self.LOCK_PREFIX + key, token, nx=True, ex=ttl)
+        return token if acquired else None
+    
+    async def release_lock(self, key: str, token: str):
+        """Release a lock previously returned by acquire_lock."""
+        await self._redis.eval(self._RELEASE_SCRIPT, 1, self.LOCK_PREFIX + key, token)
+    
+    async def wait_for(self, key: str, timeout: float, interval: float = 0.2) -> Optional[Any]:
+        """
+        Wait for another worker holding the lock to populate a key.
+        
+        Args:
+            key: Cache key being computed elsewhere
+            timeout: Maximum seconds to wait
+            interval: Seconds between polls
+        
+        Returns:
+            Cached value, or None if the lock was released without a result
+            or the timeout elapsed
+        """
+        deadline = time.monotonic() + timeout
+        
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            raw = await self._redis.get(self.KEY_PREFIX + key)
+            if raw is not None:
+                self.hits += 1
+                return orjson.loads(raw)
+            if not await self._redis.exists(self.LOCK_PREFIX + key):
+                return None
+        
+        return None
+    
+    async def clear(self):
+        """Remove all cached analyses."""
+        keys = [key async for key in self._redis.scan_iter(match=self.KEY_PREFIX + "*", count=self.SCAN_COUNT)]
+        if keys:
+            await self._redis.delete(*keys)
+    
+    async def stats(self) -> Dict:
+        """
+        Return shared size and this worker's hit/miss counters.
+        
+        Counting the size SCANs the whole Redis keyspace (O(total keys),
+        including other applications' keys), so this is meant for occasional
+        monitoring rather than the request path.
+        """
+        size = 0
+        async for _ in self._redis.scan_iter(match=self.KEY_PREFIX + "*", count=self.SCAN_COUNT):
+            size += 1
+        
+        return {
+            "backend": "redis",
+            "size": size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    async def aclose(self):
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
@@ -3,44 +3,169 @@ Configuration management for the GitHub Issue Assistant.
 Handles environment variables and application settings.
 """
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-class Config:
-    """Application configuration class."""
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Application configuration, read once from the environment."""
     
     # API Keys
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-    GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")  # Optional, for higher rate limits
+    gemini_api_key: str
+    github_token: str  # Optional, for higher rate limits
     
     # Application Settings
-    HOST = os.getenv("HOST", "0.0.0.0")
-    PORT = int(os.getenv("PORT", "8000"))
+    host: str
+    port: int
+    workers: int
+    reload: bool  # Dev only
     
     # LLM Settings
-    LLM_MODEL = "gemini-flash-latest" # Using latest stable flash model for best free tier quota
-    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+    llm_model: str
+    llm_temperature: float
+    llm_max_attempts: int  # Retries on 429/5xx/timeouts
+    
+    # Prompt token budgets (counted with Gemini's tokenizer)
+    max_body_tokens: int
+    max_comment_tokens: int  # Shared by all comments
+    token_search_steps: int  # Max count_tokens calls verifying a truncation cut point
+    
+    # Batching Settings (concurrent analyses share one LLM call)
+    batch_max_size: int
+    batch_max_delay: float  # seconds
+    max_batch_requests: int  # Issues per /api/analyze_batch call
     
     # Cache Settings
-    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
-    CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour default
+    cache_enabled: bool
+    cache_ttl: int
+    cache_max_size: int
+    cache_sweep_interval: int  # seconds
+    
+    # GitHub connection pool
+    github_max_connections: int
+    github_max_keepalive: int
+    
+    # GitHub responses kept for ETag revalidation (If-None-Match)
+    github_etag_ttl: int
+    
+    # Shared cache for multi-worker deployments (Redis or DragonflyDB)
+    redis_url: str  # Empty = in-process cache
+    cache_lock_ttl: int  # seconds
     
     @classmethod
-    def validate(cls):
-        """Validate required configuration."""
-        if not cls.GEMINI_API_KEY:
+    def from_env(cls) -> "_Config":
+        """
+        Build the configuration from environment variables.
+        
+        Raises:
+            ValueError: If a variable can't be parsed, naming the variable
+        """
+        if "WORKERS" in os.environ:
+            workers = _env_int("WORKERS", "1")
+        else:
+            workers = _env_int("WEB_CONCURRENCY", "1")
+        
+        return cls(
+            gemini_api_key=os.getenv("GEMINI_API_KEY", ""),
+            github_token=os.getenv("GITHUB_TOKEN", ""),
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=_env_int("PORT", "8000"),
+            workers=workers,
+            reload=_env_bool("RELOAD", "true" if workers == 1 else "false"),
+            llm_model="gemini-flash-latest",  # Using latest stable flash model for best free tier quota
+            llm_temperature=_env_float("LLM_TEMPERATURE", "0.1"),
+            llm_max_attempts=_env_int("LLM_MAX_ATTEMPTS", "3"),
+            max_body_tokens=_env_int("MAX_BODY_TOKENS", "2000"),
+            max_comment_tokens=_env_int("MAX_COMMENT_TOKENS", "1500"),
+            token_search_steps=_env_int("TOKEN_SEARCH_STEPS", "2"),
+            batch_max_size=_env_int("BATCH_MAX_SIZE", "8"),
+            batch_max_delay=_env_float("BATCH_MAX_DELAY", "0.1"),
+            max_batch_requests=_env_int("MAX_BATCH_REQUESTS", "50"),
+            cache_enabled=_env_bool("CACHE_ENABLED", "true"),
+            cache_ttl=_env_int("CACHE_TTL", "3600"),  # 1 hour default
+            cache_max_size=_env_int("CACHE_MAX_SIZE", "10000"),
+            cache_sweep_interval=_env_int("CACHE_SWEEP_INTERVAL", "60"),
+            github_max_connections=_env_int("GITHUB_MAX_CONNECTIONS", "100"),
+            github_max_keepalive=_env_int("GITHUB_MAX_KEEPALIVE", "20"),
+            github_etag_ttl=_env_int("GITHUB_ETAG_TTL", "86400"),  # 1 day default
+            redis_url=os.getenv("REDIS_URL", ""),
+            cache_lock_ttl=_env_int("CACHE_LOCK_TTL", "60"),
+        )
+    
+    def validate(self):
+        """
+        Validate required configuration and value ranges.
+        
+        Raises:
+            ValueError: If a setting is missing or out of range, naming its variable
+        """
+        if not self.gemini_api_key:
             raise ValueError(
                 "GEMINI_API_KEY is required. "
                 "Please set it in your .env file or environment variables."
             )
+        
+        # (variable, value, minimum, maximum or None)
+        ranges = [
+            ("PORT", self.port, 1, 65535),
+            ("WORKERS", self.workers, 1, None),
+            ("LLM_TEMPERATURE", self.llm_temperature, 0, 2),
+            ("LLM_MAX_ATTEMPTS", self.llm_max_attempts, 1, None),
+            ("MAX_BODY_TOKENS", self.max_body_tokens, 1, None),
+            ("MAX_COMMENT_TOKENS", self.max_comment_tokens, 0, None),
+            ("TOKEN_SEARCH_STEPS", self.token_search_steps, 1, None),
+            ("BATCH_MAX_SIZE", self.batch_max_size, 1, None),
+            ("BATCH_MAX_DELAY", self.batch_max_delay, 0, None),
+            ("MAX_BATCH_REQUESTS", self.max_batch_requests, 1, None),
+            ("CACHE_TTL", self.cache_ttl, 1, None),
+            ("CACHE_MAX_SIZE", self.cache_max_size, 1, None),
+            ("CACHE_SWEEP_INTERVAL", self.cache_sweep_interval, 1, None),
+            ("GITHUB_MAX_CONNECTIONS", self.github_max_connections, 1, None),
+            ("GITHUB_MAX_KEEPALIVE", self.github_max_keepalive, 0, self.github_max_connections),
+            ("GITHUB_ETAG_TTL", self.github_etag_ttl, 1, None),
+            ("CACHE_LOCK_TTL", self.cache_lock_ttl, 1, None),
+        ]
+        for name, value, minimum, maximum in ranges:
+            if value < minimum or (maximum is not None and value > maximum):
+                bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+                raise ValueError(f"{name} must be {bounds}, got {value}")
+        
+        return True
+
+
+def _env_int(name: str, default: str) -> int:
+    """Read an integer environment variable."""
+    value = os.getenv(name, default)
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def _env_float(name: str, default: str) -> float:
+    """Read a number environment variable."""
+    value = os.getenv(name, default)
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+
+def _env_bool(name: str, default: str) -> bool:
+    """Read a true/false environment variable."""
+    value = os.getenv(name, default).strip().lower()
+    if value in ("true", "1", "yes"):
         return True
+    if value in ("false", "0", "no"):
+        return False
+    raise ValueError(f"{name} must be true or false, got {value!r}")
+
 
+config = _Config.from_env()
 
-# Validate configuration on import
-try:
-    Config.validate()
-except ValueError as e:
-    print(f"⚠️  Configuration Warning: {e}")
+# Validate configuration on import, failing fast on startup
+config.validate()
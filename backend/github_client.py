@@ -3,27 +3,99 @@ GitHub API client for fetching issue data.
 Handles URL parsing, API requests, and error handling.
 """
 import re
-import requests
-from typing import Dict, List, Optional, Tuple
-from config import Config
+import httpx
+import msgspec
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, List, Optional, Tuple, Type
+from cache import LRUTTLCache
+from config import config
+
+
+# Matches https://github.com/owner/repo with optional .git suffix or trailing path
+_REPO_PATTERN = re.compile(r"github\.com/([^/]+)/([^/]+)")
+
+
+# GitHub API response shapes, decoded directly from JSON (unknown fields are ignored)
+class GitHubUser(msgspec.Struct):
+    login: str = "unknown"
+
+
+class GitHubLabel(msgspec.Struct):
+    name: str = ""
+
+
+class GitHubComment(msgspec.Struct):
+    body: Optional[str] = None
+    created_at: str = ""
+    user: Optional[GitHubUser] = None
+
+
+class GitHubIssue(msgspec.Struct):
+    title: str = ""
+    body: Optional[str] = None
+    state: str = ""
+    labels: List[GitHubLabel] = []
+    comments: int = 0
+    created_at: str = ""
+    html_url: str = ""
+
+
+class CommentData(msgspec.Struct, frozen=True):
+    """A comment as used by the analyzer."""
+    author: str
+    body: str
+    created_at: str
+
+
+class IssueData(msgspec.Struct, frozen=True):
+    """Structured issue data passed from the GitHub client to the analyzer."""
+    title: str
+    body: str
+    state: str
+    labels: List[str]
+    comments_count: int
+    comments: List[CommentData]
+    created_at: str
+    html_url: str
 
 
 class GitHubClient:
     """Client for interacting with the GitHub API."""
     
     BASE_URL = "https://api.github.com"
+    MAX_COMMENTS = 10  # Only the first 10 comments are used in the prompt
     
     def __init__(self):
         """Initialize the GitHub client with optional authentication."""
-        self.session = requests.Session()
-        self.session.headers.update({
+        headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "GitHub-Issue-Assistant/1.0"
-        })
+        }
         
         # Add authentication if token is provided (increases rate limits)
-        if Config.GITHUB_TOKEN:
-            self.session.headers["Authorization"] = f"token {Config.GITHUB_TOKEN}"
+        if config.github_token:
+            headers["Authorization"] = f"token {config.github_token}"
+        
+        # HTTP/2 + keep-alive pool so concurrent requests reuse TLS connections
+        self.client = httpx.AsyncClient(
+            base_url=self.BASE_URL,
+            headers=headers,
+            timeout=10,
+            follow_redirects=True,  # Transferred issues and renamed repos answer 301
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=config.github_max_connections,
+                max_keepalive_connections=config.github_max_keepalive
+            )
+        )
+        
+        # {url: (etag, data)} for conditional requests; 304s don't count against rate limits
+        self.etag_cache = LRUTTLCache(max_size=config.cache_max_size, ttl=config.github_etag_ttl)
+    
+    async def aclose(self):
+        """Close the underlying HTTP client and its pooled connections."""
+        await self.client.aclose()
     
     def parse_repo_url(self, repo_url: str) -> Tuple[str, str]:
         """
@@ -38,26 +110,58 @@ class GitHubClient:
         Raises:
             ValueError: If URL format is invalid
         """
-        # Support multiple URL formats
-        patterns = [
-            r"github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$",
-            r"github\.com/([^/]+)/([^/]+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, repo_url)
-            if match:
-                owner, repo = match.groups()
-                # Clean repo name from any trailing slashes or .git
-                repo = repo.rstrip('/').replace('.git', '')
-                return owner, repo
+        return self._parse(repo_url)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse(repo_url: str) -> Tuple[str, str]:
+        """Parse and memoize a repository URL (see parse_repo_url)."""
+        match = _REPO_PATTERN.search(repo_url)
+        if match:
+            owner, repo = match.groups()
+            # Clean repo name from any trailing slashes or .git
+            repo = repo.rstrip('/').replace('.git', '')
+            return owner, repo
         
         raise ValueError(
             f"Invalid GitHub repository URL: {repo_url}. "
             "Expected format: https://github.com/owner/repo"
         )
     
-    def fetch_issue(self, owner: str, repo: str, issue_number: int) -> Dict:
+    async def get_json(self, url: str, decode_type: Type) -> Any:
+        """
+        GET a GitHub API URL, revalidating any previous response via its ETag.
+        
+        Args:
+            url: GitHub API path (relative to BASE_URL)
+            decode_type: Type to decode the JSON body into
+        
+        Returns:
+            Decoded JSON body (the cached body on 304 Not Modified)
+        
+        Raises:
+            httpx.HTTPError: If API request fails
+            msgspec.ValidationError: If the body doesn't match decode_type
+        """
+        cached = self.etag_cache.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        
+        response = await self.client.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            # Unchanged since last fetch, refresh the entry's expiry
+            self.etag_cache.set(url, cached)
+            return cached[1]
+        
+        response.raise_for_status()
+        data = msgspec.json.decode(response.content, type=decode_type)
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etag_cache.set(url, (etag, data))
+        
+        return data
+    
+    async def fetch_issue(self, owner: str, repo: str, issue_number: int) -> GitHubIssue:
         """
         Fetch issue data from GitHub API.
         
@@ -67,34 +171,34 @@ class GitHubClient:
             issue_number: Issue number
         
         Returns:
-            Dictionary containing issue data
+            Decoded issue
         
         Raises:
-            requests.HTTPError: If API request fails
+            ValueError: If API request fails
         """
-        url = f"{self.BASE_URL}/repos/{owner}/{repo}/issues/{issue_number}"
+        url = f"/repos/{owner}/{repo}/issues/{issue_number}"
         
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
+            return await self.get_json(url, GitHubIssue)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 raise ValueError(
                     f"Issue #{issue_number} not found in {owner}/{repo}. "
                     "Please check the repository and issue number."
                 )
-            elif response.status_code == 403:
+            elif e.response.status_code == 403:
                 raise ValueError(
                     "GitHub API rate limit exceeded. "
                     "Please add a GITHUB_TOKEN to your .env file for higher limits."
                 )
             else:
                 raise ValueError(f"GitHub API error: {e}")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise ValueError(f"Failed to connect to GitHub API: {e}")
+        except msgspec.DecodeError as e:
+            raise ValueError(f"Unexpected GitHub API response: {e}")
     
-    def fetch_comments(self, owner: str, repo: str, issue_number: int) -> List[Dict]:
+    async def fetch_comments(self, owner: str, repo: str, issue_number: int) -> List[GitHubComment]:
         """
         Fetch comments for a specific issue.
         
@@ -104,19 +208,21 @@ class GitHubClient:
             issue_number: Issue number
         
         Returns:
-            List of comment dictionaries
+            List of decoded comments (first page of MAX_COMMENTS only)
         """
-        url = f"{self.BASE_URL}/repos/{owner}/{repo}/issues/{issue_number}/comments"
+        # Single page only; the Link header for further pages is deliberately ignored
+        url = (
+            f"/repos/{owner}/{repo}/issues/{issue_number}/comments"
+            f"?per_page={self.MAX_COMMENTS}&page=1"
+        )
         
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException:
+            return await self.get_json(url, List[GitHubComment])
+        except (httpx.HTTPError, msgspec.DecodeError):
             # If comments fail, return empty list (non-critical)
             return []
     
-    def get_issue_data(self, repo_url: str, issue_number: int) -> Dict:
+    async def get_issue_data(self, repo_url: str, issue_number: int) -> IssueData:
         """
         Complete pipeline to fetch issue and its comments.
         
@@ -125,32 +231,35 @@ class GitHubClient:
             issue_number: Issue number
         
         Returns:
-            Dictionary with structured issue data
+            IssueData with structured issue data
         """
         # Parse repository URL
         owner, repo = self.parse_repo_url(repo_url)
         
         # Fetch issue data
-        issue = self.fetch_issue(owner, repo, issue_number)
-        
-        # Fetch comments
-        comments = self.fetch_comments(owner, repo, issue_number)
-        
-        # Extract relevant data
-        return {
-            "title": issue.get("title", ""),
-            "body": issue.get("body") or "",  # Handle None case
-            "state": issue.get("state", ""),
-            "labels": [label["name"] for label in issue.get("labels", [])],
-            "comments_count": issue.get("comments", 0),
-            "comments": [
-                {
-                    "author": comment.get("user", {}).get("login", "unknown"),
-                    "body": comment.get("body", ""),
-                    "created_at": comment.get("created_at", "")
-                }
-                for comment in comments
+        issue = await self.fetch_issue(owner, repo, issue_number)
+        
+        # Fetch comments, skipping the request when the issue has none
+        if issue.comments == 0:
+            comments = []
+        else:
+            comments = await self.fetch_comments(owner, repo, issue_number)
+        
+        # Extract relevant data (only the comments the prompt will use)
+        return IssueData(
+            title=issue.title,
+            body=issue.body or "",  # Handle None case
+            state=issue.state,
+            labels=list(map(attrgetter("name"), issue.labels)) if issue.labels else [],
+            comments_count=issue.comments,
+            comments=[
+                CommentData(
+                    author=comment.user.login if comment.user else "unknown",
+                    body=comment.body or "",
+                    created_at=comment.created_at
+                )
+                for comment in comments[:self.MAX_COMMENTS]
             ],
-            "created_at": issue.get("created_at", ""),
-            "html_url": issue.get("html_url", "")
-        }
+            created_at=issue.created_at,
+            html_url=issue.html_url
+        )
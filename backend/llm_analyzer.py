@@ -2,115 +2,368 @@
 LLM-powered issue analyzer using Google Gemini.
 Includes robust prompt engineering with few-shot examples.
 """
-import json
+import asyncio
+import hashlib
+import math
+import re
+import msgspec
+import orjson
 import google.generativeai as genai
-from typing import Dict, Optional
-from config import Config
+from google.api_core import exceptions as google_exceptions
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from typing import Any, Dict, List, Optional, Pattern, Union
+from cache import LRUTTLCache
+from config import config
+from github_client import IssueData
 
 
-class LLMAnalyzer:
-    """Analyzes GitHub issues using LLM with structured output."""
-    
-    def __init__(self):
-        """Initialize the LLM analyzer with Gemini API."""
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(Config.LLM_MODEL)
-        
-    def create_prompt(self, issue_data: Dict) -> str:
-        """
-        Create a well-engineered prompt with few-shot examples.
-        
-        Args:
-            issue_data: Dictionary containing issue information
-        
-        Returns:
-            Formatted prompt string
-        """
-        # Truncate very long bodies to avoid token limits
-        body = issue_data.get("body", "")
-        if len(body) > 4000:
-            body = body[:4000] + "\n... (truncated for length)"
-        
-        # Format comments
-        comments_text = ""
-        if issue_data.get("comments"):
-            comments_list = issue_data["comments"][:10]  # Limit to first 10 comments
-            for i, comment in enumerate(comments_list, 1):
-                comment_body = comment.get("body", "")
-                if len(comment_body) > 500:
-                    comment_body = comment_body[:500] + "..."
-                comments_text += f"\nComment {i} by {comment.get('author', 'unknown')}:\n{comment_body}\n"
-        else:
-            comments_text = "No comments yet."
-        
-        prompt = f"""You are an expert GitHub issue analyst. Analyze the following GitHub issue and provide a structured JSON response.
+# Optional ```json ... ``` fence wrapped around the whole response
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
 
-**IMPORTANT**: You must respond with ONLY valid JSON in the exact format specified below. Do not include any markdown, explanations, or text outside the JSON object.
+# Outermost JSON object / array, used when the model adds stray text
+_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+# Opening fence of a streamed response, if any
+_OPEN_FENCE = "```json"
+
+# Fraction of the estimated cut point kept when truncating to a token budget
+_CUT_MARGIN = 0.95
+
+# Leading prose tolerated before the JSON starts; _OBJECT_RE / _ARRAY_RE recover it
+_MAX_PREAMBLE_CHARS = 200
+
+
+class MalformedStreamError(Exception):
+    """Raised when a streamed response is clearly not JSON, so it can be aborted early."""
 
-Required JSON Format:
-{{
-  "summary": "A comprehensive, multi-sentence paragraph (approx 50-70 words) fully explaining the issue context, the problem, and the proposed solution.",
-  "type": "One of: bug, feature_request, documentation, question, or other",
-  "priority_score": "A number from 1-5 where 1=low, 2=minor, 3=moderate, 4=high, 5=critical. Include a full sentence justification.",
-  "suggested_labels": ["2-3 relevant labels"],
-  "potential_impact": "A detailed paragraph explaining the specific consequences for users, developers, and the business if this is not addressed."
-}}
 
+# Gemini service failures (429, 5xx, timeouts), unrelated to the prompt content
+_TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
 
+# Failures worth retrying: transient ones and aborted streams
+_RETRYABLE_ERRORS = _TRANSIENT_ERRORS + (MalformedStreamError,)
+
+# Instructions, output schema and few-shot examples, kept out of the user prompt
+# as the system instruction (the SDK still sends it with every request)
+_SYSTEM_INSTRUCTION = """You are an expert GitHub issue analyst. Analyze the GitHub issue you are given and provide a structured JSON response.
+
+**IMPORTANT**: You must respond with ONLY valid JSON in the exact format specified below. Do not include any markdown, explanations, or text outside the JSON.
+
+When you are given several issues marked <<ITEM 1>>, <<ITEM 2>>, ..., analyze each independently and respond with a JSON array containing one object per item, in the same order as the items.
+
+Required JSON Format:
+{"summary": "A comprehensive, multi-sentence paragraph (approx 50-70 words) fully explaining the issue context, the problem, and the proposed solution.", "type": "One of: bug, feature_request, documentation, question, or other", "priority_score": "A number from 1-5 where 1=low, 2=minor, 3=moderate, 4=high, 5=critical. Include a full sentence justification.", "suggested_labels": ["2-3 relevant labels"], "potential_impact": "A detailed paragraph explaining the specific consequences for users, developers, and the business if this is not addressed."}
 
 Example 1 - Bug Report:
 Issue Title: "Application crashes when clicking submit button"
 Issue Body: "When I click the submit button on the login form, the app crashes immediately. This happens consistently on iOS 17."
 Analysis:
-{{
+{
   "summary": "Login form submit button causes consistent app crashes on iOS 17",
   "type": "bug",
   "priority_score": "5 - Critical: Blocks core functionality (login) for all iOS 17 users",
   "suggested_labels": ["bug", "crash", "ios", "login"],
   "potential_impact": "Users cannot log in on iOS 17, completely blocking app access for this user segment"
-}}
+}
 
 Example 2 - Feature Request:
 Issue Title: "Add dark mode support"
 Issue Body: "It would be great to have a dark mode option for better viewing at night."
 Analysis:
-{{
+{
   "summary": "Request for dark mode theme option for improved nighttime viewing experience",
   "type": "feature_request",
   "priority_score": "2 - Low: Nice-to-have enhancement, not blocking any functionality",
   "suggested_labels": ["enhancement", "ui", "dark-mode"],
   "potential_impact": "Would improve user experience for users who prefer dark interfaces, but no current functionality is broken"
-}}
+}
 
 Example 3 - Question:
 Issue Title: "How to configure SSL certificates?"
 Issue Body: "I'm trying to set up SSL but can't find documentation on where to place the certificates."
 Analysis:
-{{
+{
   "summary": "User needs guidance on SSL certificate configuration and file placement",
   "type": "question",
   "priority_score": "3 - Moderate: Indicates documentation gap affecting user onboarding",
   "suggested_labels": ["question", "documentation", "ssl"],
   "potential_impact": "May indicate unclear documentation that could confuse other users during setup"
-}}
+}"""
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM cannot produce a usable analysis."""
 
----
 
-Now analyze this issue:
+class LLMBlockedError(LLMUnavailableError):
+    """Raised when Gemini blocks the prompt (e.g. for safety reasons)."""
 
-**Issue Title:** {issue_data.get('title', 'No title')}
+
+class LLMAnalyzer:
+    """Analyzes GitHub issues using LLM with structured output."""
+    
+    # Static instructions live in the system instruction; prompts carry only the issues
+    _PROMPT_PREFIX = "Now analyze this issue:\n\n"
+    _PROMPT_SUFFIX = "\n\nProvide your analysis as valid JSON only:"
+    _BATCH_PROMPT_PREFIX = "Now analyze these issues:\n\n"
+    
+    def __init__(self):
+        """Initialize the LLM analyzer with Gemini API."""
+        genai.configure(api_key=config.gemini_api_key)
+        self.model = genai.GenerativeModel(config.llm_model, system_instruction=_SYSTEM_INSTRUCTION)
+        
+        # Separate model for counting, as count_tokens would include the system instruction
+        self.token_model = genai.GenerativeModel(config.llm_model)
+        self.token_cache = LRUTTLCache(max_size=config.cache_max_size, ttl=config.cache_ttl)
+    
+    async def count_tokens(self, text: str) -> int:
+        """
+        Count Gemini tokens in a text, memoized by a digest of the text.
+        
+        Args:
+            text: Text to count
+        
+        Returns:
+            Number of tokens (a ~4 characters/token estimate if counting fails)
+        """
+        key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        tokens = self.token_cache.get(key)
+        if tokens is not None:
+            return tokens
+        
+        try:
+            response = await self.token_model.count_tokens_async(text)
+        except google_exceptions.GoogleAPIError:
+            return len(text) // 4 + 1
+        
+        self.token_cache.set(key, response.total_tokens)
+        return response.total_tokens
+    
+    async def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to at most max_tokens Gemini tokens.
+        
+        Estimates the cut point from the text's characters-per-token ratio
+        and verifies it, re-estimating from the latest count while the
+        prefix is still over budget (at most TOKEN_SEARCH_STEPS extra
+        count_tokens calls, usually one).
+        
+        Args:
+            text: Text to truncate
+            max_tokens: Token budget
+        
+        Returns:
+            Original text if it fits, otherwise a prefix estimated to fit
+        """
+        # A token spans at least one character, so short texts always fit
+        if len(text) <= max_tokens:
+            return text
+        
+        tokens = await self.count_tokens(text)
+        if tokens <= max_tokens:
+            return text
+        
+        cut = len(text)
+        for _ in range(config.token_search_steps):
+            # Aim a little under the budget, as the ratio varies along the text
+            cut = int(cut * max_tokens / tokens * _CUT_MARGIN)
+            tokens = await self.count_tokens(text[:cut])
+            if tokens <= max_tokens:
+                return text[:cut]
+        
+        # Out of verification calls, fall back to the latest estimate
+        return text[:int(cut * max_tokens / tokens * _CUT_MARGIN)]
+    
+    async def fit_to_budget(self, issue_data: IssueData) -> IssueData:
+        """
+        Truncate the issue body and comments to their token budgets.
+        
+        The body is limited to MAX_BODY_TOKENS. Comments share
+        MAX_COMMENT_TOKENS in order; once it is used up, later comments
+        are dropped. Comments are counted with a single count_tokens call,
+        and each comment's share is estimated from their overall
+        characters-per-token ratio.
+        
+        Args:
+            issue_data: IssueData describing the issue
+        
+        Returns:
+            IssueData with body and comments fitted to the budgets
+        """
+        body = await self.truncate_to_tokens(issue_data.body, config.max_body_tokens)
+        if len(body) < len(issue_data.body):
+            body += "\n... (truncated for length)"
+        
+        comments = issue_data.comments[:10]  # Limit to first 10 comments
+        chars = sum(len(comment.body) for comment in comments)
+        if chars > config.max_comment_tokens:
+            total = await self.count_tokens("\n".join(comment.body for comment in comments))
+            if total > config.max_comment_tokens:
+                chars_per_token = chars / total
+                
+                fitted = []
+                remaining = config.max_comment_tokens
+                for comment in comments:
+                    tokens = math.ceil(len(comment.body) / chars_per_token)
+                    if tokens > remaining:
+                        # Budget runs out within this comment; later ones are dropped
+                        if remaining > 0:
+                            comment_body = await self.truncate_to_tokens(comment.body, remaining)
+                            fitted.append(msgspec.structs.replace(comment, body=comment_body + "..."))
+                        break
+                    fitted.append(comment)
+                    remaining -= tokens
+                comments = fitted
+        
+        return msgspec.structs.replace(issue_data, body=body, comments=comments)
+    
+    def format_issue(self, issue_data: IssueData) -> str:
+        """
+        Format the per-issue section of a prompt.
+        
+        Expects an issue already fitted to its token budget (see fit_to_budget).
+        
+        Args:
+            issue_data: IssueData describing the issue
+        
+        Returns:
+            Formatted issue string
+        """
+        body = issue_data.body
+        
+        # Format comments
+        comments_text = ""
+        if issue_data.comments:
+            comments_list = issue_data.comments[:10]  # Limit to first 10 comments
+            for i, comment in enumerate(comments_list, 1):
+                comments_text += f"\nComment {i} by {comment.author}:\n{comment.body}\n"
+        else:
+            comments_text = "No comments yet."
+        
+        issue_text = f"""**Issue Title:** {issue_data.title or 'No title'}
 
 **Issue Body:**
 {body if body else 'No description provided'}
 
 **Comments:**
-{comments_text}
-
-**Existing Labels:** {', '.join(issue_data.get('labels', [])) if issue_data.get('labels') else 'None'}
-
-Provide your analysis as valid JSON only:"""
+{comments_text}"""
+        
+        if issue_data.labels:
+            issue_text += f"\n\n**Existing Labels:** {', '.join(issue_data.labels)}"
+        
+        return issue_text
+    
+    def create_prompt(self, issue_data: IssueData) -> str:
+        """
+        Create the per-issue prompt (few-shot examples are in the system instruction).
+        
+        Args:
+            issue_data: IssueData describing the issue
+        
+        Returns:
+            Formatted prompt string
+        """
+        return self._PROMPT_PREFIX + self.format_issue(issue_data) + self._PROMPT_SUFFIX
+    
+    def create_batch_prompt(self, issues: List[IssueData]) -> str:
+        """
+        Create a single prompt that analyzes several issues at once.
+        
+        Args:
+            issues: List of IssueData objects
         
-        return prompt
+        Returns:
+            Formatted prompt string asking for a JSON array
+        """
+        items = "\n\n".join(
+            f"<<ITEM {i}>>\n{self.format_issue(issue_data)}"
+            for i, issue_data in enumerate(issues, 1)
+        )
+        
+        return (
+            self._BATCH_PROMPT_PREFIX
+            + items
+            + f"\n\nProvide your analyses as a valid JSON array of exactly {len(issues)} objects only, e.g. [{{...}}, {{...}}]:"
+        )
+    
+    def strip_markdown(self, response_text: str) -> str:
+        """
+        Remove markdown code fences wrapped around an LLM response.
+        
+        Args:
+            response_text: Raw response from LLM
+        
+        Returns:
+            Response text without code fences
+        """
+        match = _FENCE_RE.match(response_text)
+        return match.group(1) if match else response_text.strip()
+    
+    def decode_json(self, response_text: str, fallback: Pattern) -> Any:
+        """
+        Decode JSON from an LLM response.
+        
+        Args:
+            response_text: Raw response from LLM
+            fallback: Pattern locating the JSON value if the text has stray content
+        
+        Returns:
+            Decoded JSON value
+        
+        Raises:
+            ValueError: If response is not valid JSON
+        """
+        response_text = self.strip_markdown(response_text)
+        
+        try:
+            return orjson.loads(response_text)
+        except orjson.JSONDecodeError as e:
+            match = fallback.search(response_text)
+            if match:
+                try:
+                    return orjson.loads(match.group(0))
+                except orjson.JSONDecodeError:
+                    pass
+            raise ValueError(f"Failed to parse LLM response as JSON: {e}\nResponse: {response_text[:200]}")
+    
+    def validate_analysis(self, data: Dict) -> Dict:
+        """
+        Validate and normalize a single analysis object.
+        
+        Args:
+            data: Decoded analysis object
+        
+        Returns:
+            Normalized analysis dictionary
+        
+        Raises:
+            ValueError: If required fields are missing
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+        
+        # Validate required fields
+        required_fields = ["summary", "type", "priority_score", "suggested_labels", "potential_impact"]
+        for field in required_fields:
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+        
+        # Validate type
+        valid_types = ["bug", "feature_request", "documentation", "question", "other"]
+        if data["type"] not in valid_types:
+            data["type"] = "other"
+        
+        # Ensure suggested_labels is a list
+        if not isinstance(data["suggested_labels"], list):
+            data["suggested_labels"] = [str(data["suggested_labels"])]
+        
+        return data
     
     def parse_response(self, response_text: str) -> Dict:
         """
@@ -125,102 +378,192 @@ Provide your analysis as valid JSON only:"""
         Raises:
             ValueError: If response is not valid JSON
         """
-        # Try to find JSON in the response
-        response_text = response_text.strip()
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            # Extract content between ```json and ```
-            lines = response_text.split('\n')
-            start_idx = 0
-            end_idx = len(lines)
-            
-            for i, line in enumerate(lines):
-                if line.strip().startswith("```"):
-                    if start_idx == 0:
-                        start_idx = i + 1
-                    else:
-                        end_idx = i
-                        break
-            
-            response_text = '\n'.join(lines[start_idx:end_idx])
+        data = self.decode_json(response_text, _OBJECT_RE)
         
-        try:
-            data = json.loads(response_text)
-            
-            # Validate required fields
-            required_fields = ["summary", "type", "priority_score", "suggested_labels", "potential_impact"]
-            for field in required_fields:
-                if field not in data:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            # Validate type
-            valid_types = ["bug", "feature_request", "documentation", "question", "other"]
-            if data["type"] not in valid_types:
-                data["type"] = "other"
-            
-            # Ensure suggested_labels is a list
-            if not isinstance(data["suggested_labels"], list):
-                data["suggested_labels"] = [str(data["suggested_labels"])]
-            
-            return data
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse LLM response as JSON: {e}\nResponse: {response_text[:200]}")
+        return self.validate_analysis(data)
     
-    def analyze_issue(self, issue_data: Dict) -> Dict:
+    def parse_batch_response(self, response_text: str, expected: int) -> List[Dict]:
         """
-        Analyze a GitHub issue using LLM.
+        Parse a batched LLM response into one analysis per issue.
         
         Args:
-            issue_data: Dictionary containing issue information
+            response_text: Raw response from LLM
+            expected: Number of analyses the prompt asked for
         
         Returns:
-            Structured analysis as dictionary
+            List of parsed JSON dictionaries, in prompt order
         
         Raises:
-            ValueError: If analysis fails
+            ValueError: If response is not a JSON array of the expected length
+        """
+        data = self.decode_json(response_text, _ARRAY_RE)
+        
+        if not isinstance(data, list) or len(data) != expected:
+            raise ValueError(f"Expected a JSON array of {expected} analyses")
+        
+        return [self.validate_analysis(item) for item in data]
+    
+    def check_stream_start(self, buffer: str):
+        """
+        Validate the beginning of a streamed response.
+        
+        A response may open with a ```json fence, and may start with a short
+        preamble (e.g. "Here is the analysis:") that the fallback patterns in
+        decode_json recover from. Only a response with no JSON in sight after
+        _MAX_PREAMBLE_CHARS is aborted. Text that could still turn into an
+        opening fence (e.g. "```js" at a chunk boundary) is left undecided.
+        
+        Args:
+            buffer: Response text received so far
+        
+        Raises:
+            MalformedStreamError: If the response is clearly not JSON
+        """
+        text = buffer.lstrip()
+        if _OPEN_FENCE.startswith(text):
+            # Empty, or a fence still arriving
+            return
+        
+        if text.startswith("```"):
+            text = text[3:]
+            if text.startswith("json"):
+                text = text[4:]
+            text = text.lstrip()
+            if not text:
+                return
+        
+        if text[0] in "{[":
+            return
+        
+        if len(text) > _MAX_PREAMBLE_CHARS and "{" not in text and "[" not in text:
+            raise MalformedStreamError(f"LLM response is not JSON: {text[:50]!r}")
+    
+    async def generate(self, prompt: str) -> str:
+        """
+        Stream an LLM response, retrying transient failures with exponential backoff.
+        
+        Chunks are validated as they arrive: a response with no JSON in its
+        opening characters is aborted and retried instead of waiting for the
+        full generation, and reading stops as soon as the text parses as JSON.
+        Rate limiting (429), server errors (5xx), timeouts and aborted
+        streams are retried; other errors fail immediately.
+        
+        Args:
+            prompt: Prompt to send
+        
+        Returns:
+            Raw response text
+        
+        Raises:
+            LLMBlockedError: If the prompt is blocked
+            LLMUnavailableError: If the call fails or all retries are exhausted
         """
         try:
-            # Create prompt
-            prompt = self.create_prompt(issue_data)
-            
-            # Generate response with retry logic
-            max_retries = 2
-            last_error = None
-            
-            for attempt in range(max_retries):
-                try:
-                    response = self.model.generate_content(
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+                wait=wait_exponential_jitter(initial=0.5, max=8),
+                stop=stop_after_attempt(config.llm_max_attempts),
+                reraise=True
+            ):
+                with attempt:
+                    response = await self.model.generate_content_async(
                         prompt,
                         generation_config=genai.types.GenerationConfig(
-                            temperature=Config.LLM_TEMPERATURE,
+                            temperature=config.llm_temperature,
                             candidate_count=1,
-                        )
+                        ),
+                        stream=True
                     )
                     
-                    # Extract text from response
-                    response_text = response.text
-                    
-                    # Parse and validate response
-                    analysis = self.parse_response(response_text)
+                    buffer = ""
+                    async for chunk in response:
+                        try:
+                            buffer += chunk.text
+                        except ValueError:
+                            # Chunk without text parts (e.g. finish reason only)
+                            continue
+                        
+                        self.check_stream_start(buffer)
+                        
+                        # Stop reading once the response is complete JSON
+                        if buffer.rstrip().endswith(("}", "]", "```")):
+                            try:
+                                orjson.loads(self.strip_markdown(buffer))
+                                break
+                            except orjson.JSONDecodeError:
+                                continue
                     
-                    return analysis
-                    
-                except Exception as e:
-                    last_error = e
-                    if attempt < max_retries - 1:
-                        continue
-            
-            # If all retries failed
-            raise ValueError(f"LLM analysis failed after {max_retries} attempts: {last_error}")
-            
-        except Exception as e:
-            # Provide fallback response in case of complete failure
-            return {
-                "summary": f"Analysis unavailable: {str(e)}",
-                "type": "other",
-                "priority_score": "3 - Unable to determine automatically",
-                "suggested_labels": ["needs-triage"],
-                "potential_impact": "Unable to analyze due to LLM error"
-            }
+                    return buffer
+        except genai.types.BlockedPromptException as e:
+            raise LLMBlockedError(f"LLM blocked the prompt: {e}") from e
+        except (
+            google_exceptions.GoogleAPIError,
+            MalformedStreamError,
+            genai.types.StopCandidateException,
+            genai.types.IncompleteIterationError,
+            genai.types.BrokenResponseError,
+        ) as e:
+            raise LLMUnavailableError(f"LLM analysis failed: {e}") from e
+    
+    async def analyze_issue(self, issue_data: IssueData) -> Dict:
+        """
+        Analyze a GitHub issue using LLM.
+        
+        Args:
+            issue_data: IssueData describing the issue
+        
+        Returns:
+            Structured analysis as dictionary
+        
+        Raises:
+            LLMUnavailableError: If analysis fails
+        """
+        issue_data = await self.fit_to_budget(issue_data)
+        response_text = await self.generate(self.create_prompt(issue_data))
+        
+        try:
+            return self.parse_response(response_text)
+        except ValueError as e:
+            raise LLMUnavailableError(f"LLM returned an invalid response: {e}")
+    
+    async def analyze_batch(self, issues: List[IssueData]) -> List[Union[Dict, Exception]]:
+        """
+        Analyze several GitHub issues with a single LLM call.
+        
+        Falls back to analyzing each issue individually if the batched
+        response cannot be parsed or the batched call fails with a
+        error caused by its content (e.g. one issue's content is blocked or
+        the model answers with prose), so one bad issue doesn't fail the
+        others.
+        
+        Args:
+            issues: List of IssueData objects
+        
+        Returns:
+            List of structured analyses (or the exception raised for that
+            issue), in the same order as issues
+        
+        Raises:
+            LLMUnavailableError: If Gemini is still unavailable (429, 5xx,
+                timeouts) after retries
+        """
+        if len(issues) == 1:
+            return [await self.analyze_issue(issues[0])]
+        
+        fitted = await asyncio.gather(*(self.fit_to_budget(issue_data) for issue_data in issues))
+        
+        try:
+            response_text = await self.generate(self.create_batch_prompt(list(fitted)))
+            return self.parse_batch_response(response_text, len(issues))
+        except LLMUnavailableError as e:
+            if isinstance(e.__cause__, _TRANSIENT_ERRORS):
+                # Gemini itself is unavailable, per-issue calls would fail the same way
+                raise
+        except ValueError:
+            pass
+        
+        # Batched call or output was unusable, retry each issue on its own
+        return list(await asyncio.gather(
+            *(self.analyze_issue(issue_data) for issue_data in issues),
+            return_exceptions=True
+        ))
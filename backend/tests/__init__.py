@@ -0,0 +1,8 @@
+"""
+Unit tests for the GitHub Issue Assistant backend.
+Run from backend/ with: python -m unittest
+"""
+import os
+
+# config validates on import, so tests need a (fake) key
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
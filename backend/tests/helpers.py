@@ -0,0 +1,27 @@
+"""
+Shared fixtures for the backend tests.
+"""
+from github_client import CommentData, IssueData
+
+
+ANALYSIS = {
+    "summary": "Login crashes on iOS",
+    "type": "bug",
+    "priority_score": "5 - Critical",
+    "suggested_labels": ["bug", "ios"],
+    "potential_impact": "Users cannot log in"
+}
+
+
+def make_issue(title: str = "Title", body: str = "Body", comments=()) -> IssueData:
+    """Build an IssueData with the given title, body and comment bodies."""
+    return IssueData(
+        title=title,
+        body=body,
+        state="open",
+        labels=[],
+        comments_count=len(comments),
+        comments=[CommentData(author="alice", body=comment, created_at="") for comment in comments],
+        created_at="",
+        html_url=""
+    )
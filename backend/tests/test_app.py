@@ -0,0 +1,100 @@
+"""
+Tests for the API's cache helpers, endpoints and in-flight coalescing.
+"""
+import asyncio
+import unittest
+
+import app
+from cache import LRUTTLCache, RedisCache
+from tests.helpers import ANALYSIS
+
+
+class RedisFallbackTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.original = (app.cache, app.redis_cache)
+        app.cache = LRUTTLCache(max_size=10, ttl=60)
+        # Nothing listens on port 1, so every command fails to connect
+        app.redis_cache = RedisCache("redis://127.0.0.1:1/0")
+    
+    async def asyncTearDown(self):
+        await app.redis_cache.aclose()
+        app.cache, app.redis_cache = self.original
+    
+    async def test_cache_degrades_to_memory(self):
+        with self.assertLogs("app", level="WARNING"):
+            await app.set_cache("key", ANALYSIS)
+            cached = await app.get_from_cache("key")
+        
+        self.assertEqual(cached, ANALYSIS)
+        self.assertEqual(app.cache.get("key"), ANALYSIS)
+    
+    
+    async def test_stats_report_memory_cache(self):
+        app.cache.set("key", ANALYSIS)
+        
+        with self.assertLogs("app", level="WARNING"):
+            stats = await app.cache_stats()
+        
+        self.assertEqual(stats["backend"], "memory")
+        self.assertEqual(stats["size"], 1)
+    
+    async def test_clear_still_clears_memory_cache(self):
+        app.cache.set("key", ANALYSIS)
+        
+        with self.assertLogs("app", level="WARNING"):
+            await app.clear_cache()
+        
+        self.assertEqual(len(app.cache), 0)
+
+
+
+class InFlightTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.original = (app.cache, app.redis_cache, app.run_analysis)
+        app.cache = LRUTTLCache(max_size=10, ttl=60)
+        app.redis_cache = None
+        app.run_analysis = self.fake_run_analysis
+        self.runs = 0
+        self.release = asyncio.Event()
+    
+    async def asyncTearDown(self):
+        app.cache, app.redis_cache, app.run_analysis = self.original
+    
+    async def fake_run_analysis(self, request: app.AnalyzeRequest):
+        self.runs += 1
+        await self.release.wait()
+        return {**ANALYSIS, "summary": f"issue {request.issue_number}"}
+    
+    def request(self, issue_number: int = 1) -> app.AnalyzeRequest:
+        return app.AnalyzeRequest(repo_url="https://github.com/o/r", issue_number=issue_number)
+    
+    async def test_identical_requests_share_one_analysis(self):
+        tasks = [asyncio.ensure_future(app.analyze_one(self.request())) for _ in range(3)]
+        other = asyncio.ensure_future(app.analyze_one(self.request(2)))
+        await asyncio.sleep(0)
+        self.release.set()
+        
+        results = await asyncio.gather(*tasks)
+        
+        self.assertEqual([result["summary"] for result in results], ["issue 1"] * 3)
+        self.assertEqual((await other)["summary"], "issue 2")
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(app.in_flight, {})
+        self.assertIsNotNone(app.cache.get(app.get_cache_key("https://github.com/o/r", 1)))
+    
+    async def test_cancelled_caller_does_not_cancel_shared_analysis(self):
+        first = asyncio.ensure_future(app.analyze_one(self.request()))
+        second = asyncio.ensure_future(app.analyze_one(self.request()))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        self.release.set()
+        
+        self.assertEqual((await second)["summary"], "issue 1")
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
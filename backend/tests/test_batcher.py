@@ -0,0 +1,91 @@
+"""
+Tests for AnalysisBatcher demultiplexing.
+"""
+import asyncio
+import unittest
+
+from batcher import AnalysisBatcher
+from tests.helpers import make_issue
+
+
+class FakeAnalyzer:
+    """Records batches and answers each issue with its own title."""
+    
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+    
+    async def analyze_batch(self, issues):
+        self.batches.append([issue.title for issue in issues])
+        if self.error is not None:
+            raise self.error
+        return [
+            ValueError(f"bad issue {issue.title}") if issue.title.startswith("bad") else {"summary": issue.title}
+            for issue in issues
+        ]
+    
+    async def analyze_issue(self, issue):
+        return {"summary": issue.title}
+
+
+class AnalysisBatcherTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.analyzer = FakeAnalyzer()
+        self.batcher = AnalysisBatcher(self.analyzer, max_batch_size=8, max_delay=0.05)
+        await self.batcher.start()
+    
+    async def asyncTearDown(self):
+        await self.batcher.stop()
+    
+    async def test_concurrent_issues_share_one_call(self):
+        results = await asyncio.gather(
+            *(self.batcher.analyze_issue(make_issue(title=f"issue {i}")) for i in range(3))
+        )
+        
+        self.assertEqual(self.analyzer.batches, [["issue 0", "issue 1", "issue 2"]])
+        self.assertEqual([result["summary"] for result in results], ["issue 0", "issue 1", "issue 2"])
+    
+    async def test_batches_are_capped_at_max_batch_size(self):
+        self.batcher.max_batch_size = 2
+        
+        results = await asyncio.gather(
+            *(self.batcher.analyze_issue(make_issue(title=f"issue {i}")) for i in range(5))
+        )
+        
+        self.assertEqual([len(batch) for batch in self.analyzer.batches], [2, 2, 1])
+        self.assertEqual([result["summary"] for result in results], [f"issue {i}" for i in range(5)])
+    
+    async def test_item_error_only_fails_its_caller(self):
+        results = await asyncio.gather(
+            self.batcher.analyze_issue(make_issue(title="good 1")),
+            self.batcher.analyze_issue(make_issue(title="bad")),
+            self.batcher.analyze_issue(make_issue(title="good 2")),
+            return_exceptions=True
+        )
+        
+        self.assertEqual(results[0], {"summary": "good 1"})
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], {"summary": "good 2"})
+    
+    async def test_batch_error_fails_every_caller(self):
+        self.analyzer.error = RuntimeError("LLM down")
+        
+        results = await asyncio.gather(
+            *(self.batcher.analyze_issue(make_issue(title=f"issue {i}")) for i in range(2)),
+            return_exceptions=True
+        )
+        
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+    
+    async def test_runs_directly_when_not_started(self):
+        await self.batcher.stop()
+        
+        result = await self.batcher.analyze_issue(make_issue(title="direct"))
+        
+        self.assertEqual(result, {"summary": "direct"})
+        self.assertEqual(self.analyzer.batches, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
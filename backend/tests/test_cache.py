@@ -0,0 +1,72 @@
+"""
+Tests for the in-process LRU/TTL cache.
+"""
+import unittest
+from unittest import mock
+
+from cache import LRUTTLCache
+
+
+class LRUTTLCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("cache.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = LRUTTLCache(max_size=2, ttl=60)
+    
+    def test_get_returns_value_until_it_expires(self):
+        self.cache.set("a", 1)
+        
+        self.now += 59
+        self.assertEqual(self.cache.get("a"), 1)
+        
+        self.now += 1
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+    
+    def test_set_refreshes_expiry(self):
+        self.cache.set("a", 1)
+        self.now += 50
+        self.cache.set("a", 2)
+        
+        self.now += 50
+        self.assertEqual(self.cache.get("a"), 2)
+    
+    def test_evicts_least_recently_used(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")  # "b" is now least recently used
+        self.cache.set("c", 3)
+        
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.evictions, 1)
+    
+    def test_sweep_drops_only_expired_entries(self):
+        self.cache.set("old", 1)
+        self.now += 30
+        self.cache.set("new", 2)
+        self.now += 30
+        
+        self.assertEqual(self.cache.sweep(), 1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.get("new"), 2)
+    
+    def test_stats_and_clear(self):
+        self.cache.set("a", 1)
+        self.cache.get("a")
+        self.cache.get("missing")
+        
+        stats = self.cache.stats()
+        self.assertEqual((stats["size"], stats["hits"], stats["misses"]), (1, 1, 1))
+        
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
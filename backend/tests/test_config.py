@@ -0,0 +1,61 @@
+"""
+Tests for configuration parsing and validation.
+"""
+import os
+import unittest
+from dataclasses import FrozenInstanceError
+from unittest import mock
+
+from config import _Config
+
+
+def load(**env) -> _Config:
+    """Build and validate a config from the current environment plus env."""
+    with mock.patch.dict(os.environ, env):
+        config = _Config.from_env()
+    config.validate()
+    return config
+
+
+class ConfigTest(unittest.TestCase):
+    
+    def test_defaults_are_valid(self):
+        config = load()
+        
+        self.assertEqual(config.port, 8000)
+        self.assertTrue(config.cache_enabled)
+    
+    def test_config_is_frozen(self):
+        with self.assertRaises(FrozenInstanceError):
+            load().port = 9000
+    
+    def test_parse_error_names_the_variable(self):
+        with self.assertRaisesRegex(ValueError, "BATCH_MAX_SIZE must be an integer, got 'eight'"):
+            load(BATCH_MAX_SIZE="eight")
+        with self.assertRaisesRegex(ValueError, "CACHE_ENABLED must be true or false"):
+            load(CACHE_ENABLED="maybe")
+    
+    def test_out_of_range_values_are_rejected(self):
+        for name in ["BATCH_MAX_SIZE", "CACHE_MAX_SIZE", "WORKERS", "LLM_MAX_ATTEMPTS"]:
+            with self.subTest(name=name), self.assertRaisesRegex(ValueError, f"{name} must be at least 1"):
+                load(**{name: "0"})
+        
+        with self.assertRaisesRegex(ValueError, "PORT must be between 1 and 65535"):
+            load(PORT="70000")
+    
+    def test_missing_api_key_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "GEMINI_API_KEY is required"):
+            load(GEMINI_API_KEY="")
+    
+    def test_reload_defaults_off_with_several_workers(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("RELOAD", None)
+            os.environ.pop("WORKERS", None)
+            config = load(WEB_CONCURRENCY="4")
+        
+        self.assertEqual(config.workers, 4)
+        self.assertFalse(config.reload)
+
+
+if __name__ == "__main__":
+    unittest.main()
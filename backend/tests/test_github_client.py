@@ -0,0 +1,84 @@
+"""
+Tests for GitHubClient ETag revalidation.
+"""
+import unittest
+from unittest import mock
+
+import httpx
+
+from github_client import GitHubClient, GitHubIssue
+
+
+ISSUE = {"title": "Crash on login", "body": "Steps...", "state": "open", "comments": 0}
+
+
+class GetJsonTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("cache.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.requests = []
+        self.etag = '"v1"'
+        self.github = GitHubClient()
+        await self.github.aclose()
+        self.github.client = httpx.AsyncClient(
+            base_url=GitHubClient.BASE_URL,
+            transport=httpx.MockTransport(self.handle)
+        )
+    
+    async def asyncTearDown(self):
+        await self.github.aclose()
+    
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Fake GitHub: 304 when If-None-Match matches the current ETag."""
+        self.requests.append(request)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, json=ISSUE, headers=headers)
+    
+    async def test_not_modified_returns_cached_body(self):
+        first = await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        second = await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        
+        self.assertNotIn("If-None-Match", self.requests[0].headers)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(second, first)
+        self.assertEqual(second.title, "Crash on login")
+    
+    async def test_changed_resource_replaces_cached_etag(self):
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        self.etag = '"v2"'
+        
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        
+        self.assertEqual(self.requests[2].headers["If-None-Match"], '"v2"')
+    
+    async def test_not_modified_refreshes_expiry(self):
+        ttl = self.github.etag_cache.ttl
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        
+        self.now += ttl - 1
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        
+        # Past the first response's expiry, but the 304 renewed the entry
+        self.now += 2
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        self.assertEqual(self.requests[2].headers["If-None-Match"], '"v1"')
+    
+    async def test_response_without_etag_is_not_cached(self):
+        self.etag = None
+        
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        await self.github.get_json("/repos/o/r/issues/1", GitHubIssue)
+        
+        self.assertNotIn("If-None-Match", self.requests[1].headers)
+        self.assertEqual(len(self.github.etag_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
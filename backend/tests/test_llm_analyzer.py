@@ -0,0 +1,234 @@
+"""
+Tests for LLMAnalyzer token budgets, stream validation and batching fallbacks.
+"""
+import unittest
+
+import orjson
+from google.api_core import exceptions as google_exceptions
+
+from llm_analyzer import LLMAnalyzer, LLMBlockedError, LLMUnavailableError, MalformedStreamError
+from tests.helpers import ANALYSIS, make_issue
+
+
+FENCED = "```json\n" + orjson.dumps(ANALYSIS).decode() + "\n```"
+PREAMBLE = "Here is the analysis: " + orjson.dumps(ANALYSIS).decode()
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """Streamed Gemini response yielding the given text chunks."""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+    
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield FakeChunk(chunk)
+
+
+class TokenCount:
+    def __init__(self, total_tokens: int):
+        self.total_tokens = total_tokens
+
+
+class FitToBudgetTest(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.analyzer = LLMAnalyzer()
+        self.counted = []
+        self.analyzer.token_model.count_tokens_async = self.count_words
+    
+    async def count_words(self, text: str) -> TokenCount:
+        """Fake tokenizer: one token per whitespace-separated word."""
+        self.counted.append(text)
+        return TokenCount(len(text.split()))
+    
+    async def test_short_issue_is_not_counted(self):
+        issue = make_issue(body="word " * 10, comments=["short comment"])
+        
+        fitted = await self.analyzer.fit_to_budget(issue)
+        
+        self.assertEqual(fitted, issue)
+        self.assertEqual(self.counted, [])
+    
+    async def test_long_body_is_cut_with_one_verification(self):
+        fitted = await self.analyzer.fit_to_budget(make_issue(body="word " * 5000))
+        
+        body = fitted.body.removesuffix("\n... (truncated for length)")
+        self.assertLessEqual(len(body.split()), 2000)
+        self.assertGreater(len(body.split()), 1800)
+        self.assertEqual(len(self.counted), 2)
+    
+    async def test_comments_share_one_count(self):
+        issue = make_issue(comments=["c " * 1000, "d " * 1000, "e " * 1000])
+        
+        fitted = await self.analyzer.fit_to_budget(issue)
+        
+        words = [len(comment.body.rstrip(".").split()) for comment in fitted.comments]
+        self.assertEqual(words[0], 1000)
+        self.assertLessEqual(sum(words), 1500)
+        self.assertEqual(len(fitted.comments), 2)
+        # One count for all comments, then truncating the comment where the budget runs out
+        self.assertEqual(len(self.counted), 3)
+    
+    async def test_comments_that_fit_are_kept(self):
+        issue = make_issue(comments=["c" * 1000, "d" * 1000])
+        
+        fitted = await self.analyzer.fit_to_budget(issue)
+        
+        self.assertEqual(fitted.comments, issue.comments)
+        self.assertEqual(len(self.counted), 1)
+
+
+class CheckStreamStartTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.analyzer = LLMAnalyzer()
+    
+    def assert_every_prefix_accepted(self, text: str):
+        for end in range(len(text) + 1):
+            with self.subTest(buffer=text[:end]):
+                self.analyzer.check_stream_start(text[:end])
+    
+    def test_fence_split_across_chunks_is_undecided(self):
+        for buffer in ["`", "``", "```", "```j", "```js", "```jso", "```json", "```json\n", "  ```json  "]:
+            with self.subTest(buffer=buffer):
+                self.analyzer.check_stream_start(buffer)
+    
+    def test_fenced_response_is_accepted(self):
+        self.assert_every_prefix_accepted(FENCED)
+        self.assert_every_prefix_accepted("```\n[" + orjson.dumps(ANALYSIS).decode() + "]\n```")
+    
+    def test_bare_json_is_accepted(self):
+        self.assert_every_prefix_accepted("\n " + orjson.dumps([ANALYSIS]).decode())
+    
+    def test_preamble_before_json_is_accepted(self):
+        self.assert_every_prefix_accepted(PREAMBLE)
+        self.assert_every_prefix_accepted("```jsx\n" + orjson.dumps(ANALYSIS).decode())
+    
+    def test_long_prose_without_json_is_aborted(self):
+        with self.assertRaises(MalformedStreamError):
+            self.analyzer.check_stream_start("I'm sorry, but I can't analyze this issue. " * 10)
+    
+    def test_short_prose_is_undecided(self):
+        self.analyzer.check_stream_start("I'm sorry, but")
+
+
+class GenerateStreamTest(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.analyzer = LLMAnalyzer()
+        self.calls = 0
+    
+    def stream(self, chunks):
+        """Patch the model to stream chunks, counting calls."""
+        async def generate_content_async(prompt, **kwargs):
+            self.calls += 1
+            return FakeStream(chunks)
+        self.analyzer.model.generate_content_async = generate_content_async
+    
+    async def test_fence_split_at_json_is_not_retried(self):
+        self.stream(["```j", "son\n", FENCED[len("```json\n"):]])
+        
+        result = await self.analyzer.analyze_issue(make_issue())
+        
+        self.assertEqual(result, ANALYSIS)
+        self.assertEqual(self.calls, 1)
+    
+    async def test_preamble_is_recovered_without_retry(self):
+        self.stream([PREAMBLE[i:i + 7] for i in range(0, len(PREAMBLE), 7)])
+        
+        result = await self.analyzer.analyze_issue(make_issue())
+        
+        self.assertEqual(result, ANALYSIS)
+        self.assertEqual(self.calls, 1)
+
+
+class AnalyzeBatchFallbackTest(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.analyzer = LLMAnalyzer()
+        self.prompts = []
+        self.batch_error = None
+        self.batch_response = None
+        self.analyzer.generate = self.fake_generate
+    
+    async def fake_generate(self, prompt: str) -> str:
+        """Answer the batched prompt as configured, and single prompts per issue."""
+        self.prompts.append(prompt)
+        if "<<ITEM" in prompt:
+            if self.batch_error is not None:
+                raise self.batch_error
+            return self.batch_response
+        if "Blocked issue" in prompt:
+            raise LLMBlockedError("LLM blocked the prompt")
+        return orjson.dumps(ANALYSIS).decode()
+    
+    def unavailable(self, cause: Exception) -> LLMUnavailableError:
+        """Build the LLMUnavailableError generate() raises for cause."""
+        error = LLMUnavailableError(f"LLM analysis failed: {cause}")
+        error.__cause__ = cause
+        return error
+    
+    async def test_batched_response_is_split_in_order(self):
+        analyses = [{**ANALYSIS, "summary": f"summary {i}"} for i in range(3)]
+        self.batch_response = orjson.dumps(analyses).decode()
+        
+        results = await self.analyzer.analyze_batch([make_issue(title=f"Issue {i}") for i in range(3)])
+        
+        self.assertEqual([result["summary"] for result in results], ["summary 0", "summary 1", "summary 2"])
+        self.assertEqual(len(self.prompts), 1)
+    
+    async def test_unparsable_batch_falls_back_per_issue(self):
+        self.batch_response = "[not json"
+        
+        results = await self.analyzer.analyze_batch([make_issue(title=f"Issue {i}") for i in range(2)])
+        
+        self.assertEqual(results, [ANALYSIS, ANALYSIS])
+        self.assertEqual(len(self.prompts), 3)
+    
+    async def test_blocked_batch_only_fails_the_blocked_issue(self):
+        self.batch_error = LLMBlockedError("LLM blocked the prompt")
+        self.batch_error.__cause__ = RuntimeError("SAFETY")
+        
+        results = await self.analyzer.analyze_batch([
+            make_issue(title="Good issue"),
+            make_issue(title="Blocked issue"),
+            make_issue(title="Other issue")
+        ])
+        
+        self.assertEqual(results[0], ANALYSIS)
+        self.assertIsInstance(results[1], LLMBlockedError)
+        self.assertEqual(results[2], ANALYSIS)
+    
+    async def test_non_retryable_batch_error_falls_back_per_issue(self):
+        self.batch_error = self.unavailable(google_exceptions.InvalidArgument("bad request"))
+        
+        results = await self.analyzer.analyze_batch([make_issue(title=f"Issue {i}") for i in range(2)])
+        
+        self.assertEqual(results, [ANALYSIS, ANALYSIS])
+    
+    async def test_aborted_prose_stream_falls_back_per_issue(self):
+        self.batch_error = self.unavailable(MalformedStreamError("LLM response is not JSON"))
+        
+        results = await self.analyzer.analyze_batch([make_issue(title=f"Issue {i}") for i in range(2)])
+        
+        self.assertEqual(results, [ANALYSIS, ANALYSIS])
+        self.assertEqual(len(self.prompts), 3)
+    
+    async def test_exhausted_retries_fail_the_batch(self):
+        self.batch_error = self.unavailable(google_exceptions.ServiceUnavailable("overloaded"))
+        
+        with self.assertRaises(LLMUnavailableError):
+            await self.analyzer.analyze_batch([make_issue(title=f"Issue {i}") for i in range(2)])
+        
+        # No per-issue calls against an unavailable service
+        self.assertEqual(len(self.prompts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()